@@ -0,0 +1,129 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from .models import AdapterSpec, FieldSpec, UnifiedAlert
+
+Adapter = Callable[[Any], List[UnifiedAlert]]
+_Getter = Callable[[Any, Any], Any]
+_Extractor = Callable[[Any, Any], Optional[str]]
+
+
+def first_non_empty(*values: str | None) -> str | None:
+    for value in values:
+        if value and value.strip():
+            return value.strip()
+    return None
+
+
+def build_unified_alert(
+    title: str | None,
+    summary: str | None,
+    description: str | None,
+    severity: str | None,
+    status: str | None,
+    timestamp: str | None,
+    fingerprint: str | None = None,
+) -> UnifiedAlert:
+    """Build a UnifiedAlert from extracted values, filling in the shared defaults"""
+    title = first_non_empty(title, "Alert") or "Alert"
+    status = first_non_empty(status, "firing") or "firing"
+    severity = (first_non_empty(severity, "info") or "info").lower()
+
+    # Keep UnifiedAlert validation satisfied for terse upstream payloads.
+    if not summary and not description:
+        summary = f"{title} is {status}"
+
+    return UnifiedAlert(
+        title=title,
+        summary=summary,
+        description=description,
+        severity=severity,
+        status=status,
+        timestamp=timestamp,
+        fingerprint=fingerprint,
+    )
+
+
+def _as_text(value: Any) -> str | None:
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _compile_path(path: str) -> _Getter:
+    from_root = path == "$" or path.startswith("$.")
+    parts = path.split(".")[1:] if from_root else path.split(".")
+    steps = tuple((part, int(part) if part.lstrip("-").isdigit() else None) for part in parts)
+
+    def get(item: Any, payload: Any) -> Any:
+        node = payload if from_root else item
+        for key, index in steps:
+            if isinstance(node, dict):
+                node = node.get(key)
+            elif isinstance(node, list) and index is not None and -len(node) <= index < len(node):
+                node = node[index]
+            else:
+                return None
+        return node
+
+    return get
+
+
+def _compile_field(spec: FieldSpec) -> _Extractor:
+    getters = tuple(_compile_path(path) for path in spec.paths)
+    value_map = spec.map
+    default = spec.default
+
+    def extract(item: Any, payload: Any) -> Optional[str]:
+        value = first_non_empty(*(_as_text(get(item, payload)) for get in getters))
+        if value is not None and value_map:
+            value = value_map.get(value, value)
+        return first_non_empty(value, default)
+
+    return extract
+
+
+def compile_adapter(spec: AdapterSpec) -> Adapter:
+    """Turn a mapping spec into a function from raw payload to UnifiedAlerts.
+
+    All path parsing happens here, once, so handling a request only walks
+    the precompiled steps.
+    """
+    items = _compile_path(spec.alerts) if spec.alerts else None
+    title = _compile_field(spec.title)
+    summary = _compile_field(spec.summary)
+    description = _compile_field(spec.description)
+    severity = _compile_field(spec.severity)
+    status = _compile_field(spec.status)
+    timestamp = _compile_field(spec.timestamp)
+    fingerprint = _compile_field(spec.fingerprint)
+
+    def adapt(payload: Any) -> List[UnifiedAlert]:
+        if items is None:
+            entries = [payload]
+        else:
+            entries = items(payload, payload)
+            if isinstance(entries, dict):
+                entries = [entries]
+            elif not isinstance(entries, list):
+                entries = []
+
+        return [
+            build_unified_alert(
+                title=title(entry, payload),
+                summary=summary(entry, payload),
+                description=description(entry, payload),
+                severity=severity(entry, payload),
+                status=status(entry, payload),
+                timestamp=timestamp(entry, payload),
+                fingerprint=fingerprint(entry, payload),
+            )
+            for entry in entries
+        ]
+
+    return adapt
+
+
+def compile_adapters(specs: Dict[str, AdapterSpec]) -> Dict[str, Adapter]:
+    return {name: compile_adapter(spec) for name, spec in specs.items()}
@@ -1,11 +1,19 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
+from .models import AdapterSpec
 
 class Settings(BaseSettings):
     discord_webhook_url: str
     host: str = "0.0.0.0"
     port: int = 5001
     app_name: str = "lab-alert-middleware"
+    flap_threshold: int = 4
+    flap_window_seconds: int = 300
+    flap_max_tracked: int = 1000
+    max_in_flight: int = 4
+    rate_limit_requests: int = 30
+    rate_limit_window_seconds: int = 60
+    adapters: dict[str, AdapterSpec] = {}
 
     model_config = SettingsConfigDict(env_prefix="", case_sensitive=False)
 
@@ -20,4 +28,11 @@ class Settings(BaseSettings):
             )
         return v
 
+    @field_validator('max_in_flight')
+    @classmethod
+    def validate_max_in_flight(cls, v: int) -> int:
+        if v < 1:
+            raise ValueError('max_in_flight must be at least 1')
+        return v
+
 settings = Settings()
@@ -1,21 +1,25 @@
-from fastapi import FastAPI, HTTPException
-from typing import List, Union
+from fastapi import Body, FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Union
+from .adapters import build_unified_alert, compile_adapters, first_non_empty
 from .notifier import notifier
 from .config import settings
 from .models import AlertManagerAlert, AlertManagerPayload, UnifiedAlert
+import hashlib
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title=settings.app_name)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    await notifier.aclose()
 
-def _first_non_empty(*values: str | None) -> str | None:
-    for value in values:
-        if value and value.strip():
-            return value.strip()
-    return None
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+
+ingest_adapters = compile_adapters(settings.adapters)
 
 
 def _map_alertmanager_alert(
@@ -25,32 +29,28 @@ def _map_alertmanager_alert(
     labels = {**payload.commonLabels, **alert.labels}
     annotations = {**payload.commonAnnotations, **alert.annotations}
 
-    title = _first_non_empty(labels.get("alertname"), "Alert") or "Alert"
-    summary = _first_non_empty(
-        annotations.get("summary"),
-        annotations.get("message"),
-    )
-    description = _first_non_empty(
-        annotations.get("description"),
-        annotations.get("message"),
-    )
-    status = _first_non_empty(alert.status, payload.status, "firing") or "firing"
-    severity = (_first_non_empty(labels.get("severity"), "info") or "info").lower()
-    timestamp = _first_non_empty(alert.startsAt, alert.endsAt)
-
-    # Keep UnifiedAlert validation satisfied for terse upstream payloads.
-    if not summary and not description:
-        summary = f"{title} is {status}"
-
-    return UnifiedAlert(
-        title=title,
-        summary=summary,
-        description=description,
-        severity=severity,
-        status=status,
-        timestamp=timestamp,
+    return build_unified_alert(
+        title=labels.get("alertname"),
+        summary=first_non_empty(
+            annotations.get("summary"),
+            annotations.get("message"),
+        ),
+        description=first_non_empty(
+            annotations.get("description"),
+            annotations.get("message"),
+        ),
+        severity=labels.get("severity"),
+        status=first_non_empty(alert.status, payload.status),
+        timestamp=first_non_empty(alert.startsAt, alert.endsAt),
+        fingerprint=alert.fingerprint or _labels_fingerprint(labels),
     )
 
+
+def _labels_fingerprint(labels: dict[str, str]) -> str:
+    # Alertmanager identifies an alert by its full label set.
+    canonical = "\x00".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
 @app.post("/discord-alert")
 async def webhook_unified(alerts: Union[UnifiedAlert, List[UnifiedAlert]]) -> dict[str, str]:
     """
@@ -84,6 +84,28 @@ async def webhook_alertmanager(payload: AlertManagerPayload) -> dict[str, str]:
         raise HTTPException(status_code=500, detail=str(e))
     return {"status": "ok"}
 
+
+@app.post("/adapters/{name}")
+async def webhook_adapter(name: str, payload: Any = Body(...)) -> dict[str, str]:
+    """
+    Generic endpoint for any source configured in ADAPTERS. The payload is
+    mapped to UnifiedAlert objects by the adapter compiled at startup.
+    """
+    adapter = ingest_adapters.get(name)
+    if adapter is None:
+        raise HTTPException(status_code=404, detail=f"Unknown adapter '{name}'")
+
+    alerts = adapter(payload)
+    if not alerts:
+        raise HTTPException(status_code=422, detail="No alerts provided in payload")
+
+    try:
+        await notifier.send_notifications(alerts)
+    except Exception as e:
+        logger.error(f"Error sending '{name}' adapter notification: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"status": "ok"}
+
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "healthy"}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, model_validator
-from typing import Optional
+from typing import Any, Optional
 
 class UnifiedAlert(BaseModel):
     title: str
@@ -8,6 +8,7 @@ class UnifiedAlert(BaseModel):
     severity: str = "info"  # critical, warning, info
     status: str = "firing"  # firing, resolved
     timestamp: Optional[str] = None
+    fingerprint: Optional[str] = None  # identifies the alert instance, e.g. per host
 
     @model_validator(mode='after')
     def check_content(self) -> 'UnifiedAlert':
@@ -22,6 +23,7 @@ class AlertManagerAlert(BaseModel):
     annotations: dict[str, str] = Field(default_factory=dict)
     startsAt: Optional[str] = None
     endsAt: Optional[str] = None
+    fingerprint: Optional[str] = None
 
 
 class AlertManagerPayload(BaseModel):
@@ -30,3 +32,42 @@ class AlertManagerPayload(BaseModel):
     alerts: list[AlertManagerAlert] = Field(default_factory=list)
     commonLabels: dict[str, str] = Field(default_factory=dict)
     commonAnnotations: dict[str, str] = Field(default_factory=dict)
+
+
+class FieldSpec(BaseModel):
+    """Where an adapter reads one UnifiedAlert field from.
+
+    `paths` are tried in order; the first non-empty value wins, is translated
+    through `map` when present, and `default` is used if nothing matched.
+    A bare string or list of strings is shorthand for `paths`.
+    """
+    paths: list[str] = Field(default_factory=list)
+    map: dict[str, str] = Field(default_factory=dict)
+    default: Optional[str] = None
+
+    @model_validator(mode='before')
+    @classmethod
+    def expand_shorthand(cls, data: Any) -> Any:
+        if isinstance(data, str):
+            return {'paths': [data]}
+        if isinstance(data, list):
+            return {'paths': data}
+        return data
+
+
+class AdapterSpec(BaseModel):
+    """Declarative mapping from a third-party webhook payload to UnifiedAlert.
+
+    Paths are dotted (`labels.severity`, `alerts.0.status`) and resolve against
+    the current alert item; a `$.` prefix resolves against the whole payload.
+    When `alerts` is set it must point to a list and each entry becomes one
+    alert, otherwise the payload itself is a single alert.
+    """
+    alerts: Optional[str] = None
+    title: FieldSpec = Field(default_factory=FieldSpec)
+    summary: FieldSpec = Field(default_factory=FieldSpec)
+    description: FieldSpec = Field(default_factory=FieldSpec)
+    severity: FieldSpec = Field(default_factory=FieldSpec)
+    status: FieldSpec = Field(default_factory=FieldSpec)
+    timestamp: FieldSpec = Field(default_factory=FieldSpec)
+    fingerprint: FieldSpec = Field(default_factory=FieldSpec)
@@ -2,19 +2,26 @@ import httpx
 import logging
 import asyncio
 from datetime import datetime, timezone
-from typing import Any, Dict, List
-from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict, deque
 from .config import settings
 
 from .models import UnifiedAlert
 
 logger = logging.getLogger(__name__)
 
+Clock = Callable[[], float]
+
+
+def wall_clock() -> float:
+    return datetime.now(timezone.utc).timestamp()
+
 SEVERITY_COLORS = {
     'critical': 0xFF0000,   # Red
     'warning': 0xFFA500,    # Orange
     'info': 0x2196F3,       # Blue
-    'resolved': 0x2ECC71    # Emerald Green
+    'resolved': 0x2ECC71,   # Emerald Green
+    'flapping': 0x9B59B6    # Amethyst Purple
 }
 
 SEVERITY_EMOJIS = {
@@ -23,34 +30,193 @@ SEVERITY_EMOJIS = {
     'info': 'ℹ️'
 }
 
+class DeliveryError(Exception):
+    """Raised when one or more embed batches could not be delivered"""
+
+    def __init__(self, message: str, delivered: int, errors: List[str]) -> None:
+        super().__init__(message)
+        self.delivered = delivered
+        self.errors = errors
+
 class RateLimiter:
     """Simple rate limiter for Discord webhooks (30 requests per minute)"""
     
-    def __init__(self, max_requests: int = 30, window_seconds: int = 60) -> None:
+    def __init__(self, max_requests: int = 30, window_seconds: int = 60, clock: Clock = wall_clock) -> None:
         self.max_requests = max_requests
         self.window_seconds = window_seconds
+        self.clock = clock
         self.requests: deque = deque()
     
     async def acquire(self) -> None:
         """Wait if necessary to respect rate limits"""
-        now = datetime.now(timezone.utc).timestamp()
-        
-        while self.requests and self.requests[0] < now - self.window_seconds:
-            self.requests.popleft()
-        
-        if len(self.requests) >= self.max_requests:
+        while True:
+            now = self.clock()
+
+            while self.requests and self.requests[0] < now - self.window_seconds:
+                self.requests.popleft()
+
+            if len(self.requests) < self.max_requests:
+                break
+
             sleep_time = (self.requests[0] + self.window_seconds) - now + 0.1
-            if sleep_time > 0:
-                logger.info(f"Rate limit reached, waiting {sleep_time:.1f}s")
-                await asyncio.sleep(sleep_time)
-                await self.acquire()
+            logger.info(f"Rate limit reached, waiting {sleep_time:.1f}s")
+            await asyncio.sleep(sleep_time)
         
         self.requests.append(now)
 
+def alert_key(alert: UnifiedAlert) -> str:
+    """Identity of an alert instance across notifications.
+
+    Falls back to the title, which stays the same when the alert resolves;
+    a fingerprint splits instances that share a title.
+    """
+    return alert.fingerprint or alert.title
+
+class _FlapState:
+    """Per-alert flap bookkeeping"""
+
+    __slots__ = ('status', 'transitions', 'held_until', 'held_alert', 'held_transitions')
+
+    def __init__(self, status: str, history: int) -> None:
+        self.status = status
+        # Ring buffer of the most recent transition times; only the last
+        # `threshold` entries are needed to decide whether an alert flaps.
+        self.transitions: deque = deque(maxlen=history)
+        self.held_until: Optional[float] = None
+        self.held_alert: Optional[UnifiedAlert] = None
+        self.held_transitions = 0
+
+
+class FlapDetector:
+    """Holds back alerts that keep flipping between firing and resolved.
+
+    An alert is considered flapping once it has made `threshold` status
+    transitions within `window_seconds`. From then on its notifications are
+    held for a damping window and reported as a single summary when it closes.
+    At most `max_tracked` alerts are tracked; the least recently seen one is
+    evicted first.
+    """
+
+    def __init__(self, threshold: int = 4, window_seconds: int = 300, max_tracked: int = 1000) -> None:
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.max_tracked = max_tracked
+        self.states: OrderedDict[str, _FlapState] = OrderedDict()
+        self.held_count = 0
+        self._pending_release: List[Tuple[UnifiedAlert, int]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0 and self.window_seconds > 0
+
+    def observe(self, alerts: List[UnifiedAlert], now: float) -> List[bool]:
+        """Record one delivery's alerts and return which should be sent right away.
+
+        Only the last status seen for each alert in the call is compared with
+        its previous state, so a single payload counts as at most one
+        transition per alert.
+        """
+        if not self.enabled:
+            return [True] * len(alerts)
+
+        latest = {alert_key(alert): alert for alert in alerts}
+        forward = {key: self._observe_one(key, alert, now) for key, alert in latest.items()}
+        result = [forward[alert_key(alert)] for alert in alerts]
+        self.held_count += result.count(False)
+        return result
+
+    def _observe_one(self, key: str, alert: UnifiedAlert, now: float) -> bool:
+        state = self.states.get(key)
+        if state is None:
+            self._track(key, _FlapState(alert.status, self.threshold))
+            return True
+        self.states.move_to_end(key)
+
+        if alert.status != state.status:
+            state.status = alert.status
+            state.transitions.append(now)
+            if state.held_until is not None:
+                state.held_transitions += 1
+
+        if state.held_until is not None:
+            state.held_alert = alert
+            return False
+
+        if (len(state.transitions) == self.threshold
+                and state.transitions[0] >= now - self.window_seconds):
+            logger.info(f"Alert '{alert.title}' is flapping, holding notifications for {self.window_seconds}s")
+            state.held_until = now + self.window_seconds
+            state.held_alert = alert
+            state.held_transitions = len(state.transitions)
+            return False
+
+        return True
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest time a damping window closes, if any alert is held"""
+        if self._pending_release:
+            return float('-inf')
+        deadlines = [s.held_until for s in self.states.values() if s.held_until is not None]
+        return min(deadlines) if deadlines else None
+
+    def due(self, now: float) -> List[Tuple[UnifiedAlert, int]]:
+        """Release held alerts whose damping window has closed"""
+        released, self._pending_release = self._pending_release, []
+        for state in self.states.values():
+            if state.held_until is not None and state.held_until <= now:
+                released.append((state.held_alert, state.held_transitions))
+                state.held_until = None
+                state.held_alert = None
+                state.held_transitions = 0
+        return released
+
+    def requeue(self, released: List[Tuple[UnifiedAlert, int]]) -> None:
+        """Return released alerts whose summary could not be sent"""
+        self._pending_release.extend(released)
+
+    def _track(self, key: str, state: _FlapState) -> None:
+        self.states[key] = state
+        while len(self.states) > self.max_tracked:
+            _, evicted = self.states.popitem(last=False)
+            if evicted.held_until is not None:
+                self._pending_release.append((evicted.held_alert, evicted.held_transitions))
+
+
 class DiscordNotifier:
-    def __init__(self, webhook_url: str) -> None:
+    def __init__(
+        self,
+        webhook_url: str,
+        flap_threshold: int = 4,
+        flap_window_seconds: int = 300,
+        flap_max_tracked: int = 1000,
+        max_in_flight: int = 4,
+        rate_limit_requests: int = 30,
+        rate_limit_window_seconds: int = 60,
+        batch_size: int = 10,
+        clock: Clock = wall_clock,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
         self.webhook_url = webhook_url
-        self.rate_limiter = RateLimiter(max_requests=30, window_seconds=60)
+        self.max_in_flight = max_in_flight
+        # Shared by every delivery so the limit holds across concurrent webhooks.
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self.batch_size = min(batch_size, 10)  # Discord accepts at most 10 embeds per message
+        self.clock = clock
+        self.transport = transport
+        self.rate_limiter = RateLimiter(
+            max_requests=rate_limit_requests,
+            window_seconds=rate_limit_window_seconds,
+            clock=clock,
+        )
+        self.flap_detector = FlapDetector(
+            threshold=flap_threshold,
+            window_seconds=flap_window_seconds,
+            max_tracked=flap_max_tracked,
+        )
+        self._flap_task: Optional[asyncio.Task] = None
+        self._flap_sleep_until: Optional[float] = None
 
     def format_embed(self, alert: UnifiedAlert) -> Dict[str, Any]:
         status = alert.status
@@ -114,43 +280,226 @@ class DiscordNotifier:
             'timestamp': timestamp
         }
 
+    def format_flapping_embed(self, alert: UnifiedAlert, transitions: int) -> Dict[str, Any]:
+        embed = self.format_embed(alert)
+        full_title = f"🔁 FLAPPING ({transitions} transitions): {alert.title}"
+        if len(full_title) > 256:
+            full_title = full_title[:253] + "..."
+        embed['title'] = full_title
+        embed['color'] = SEVERITY_COLORS['flapping']
+        embed['fields'].append({
+            'name': 'Last Status',
+            'value': alert.status,
+            'inline': True
+        })
+        return embed
+
     async def send_notifications(self, alerts: List[UnifiedAlert]) -> None:
-        embeds = [self.format_embed(alert) for alert in alerts]
-        await self._send_embeds(embeds)
-
-    async def _send_embeds(self, embeds: List[Dict[str, Any]]) -> None:
-        async with httpx.AsyncClient() as client:
-            for i in range(0, len(embeds), 10):
-                await self.rate_limiter.acquire()
-                
-                batch = embeds[i:i+10]
-                payload = {
-                    'embeds': batch,
-                    'username': 'HomeLab Monitor'
-                }
-                
+        forward = self.flap_detector.observe(alerts, self.clock())
+        alerts = [alert for alert, send in zip(alerts, forward) if send]
+        self._schedule_flap_flush()
+        if alerts:
+            embeds = [self.format_embed(alert) for alert in alerts]
+            await self._send_embeds(embeds, keys=[alert_key(alert) for alert in alerts])
+
+    async def drain(self) -> None:
+        """Wait until every held flapping alert has been summarized"""
+        while self._flap_task is not None and not self._flap_task.done():
+            await asyncio.wait({self._flap_task})
+
+    async def aclose(self) -> None:
+        """Stop the flap flush task and send summaries for alerts still held"""
+        if self._flap_task is not None and not self._flap_task.done():
+            self._flap_task.cancel()
+            try:
+                await self._flap_task
+            except asyncio.CancelledError:
+                pass
+        self._flap_task = None
+
+        embeds = [
+            self.format_flapping_embed(alert, transitions)
+            for alert, transitions in self.flap_detector.due(float('inf'))
+        ]
+        if embeds:
+            try:
+                await self._send_embeds(embeds)
+            except Exception as e:
+                logger.error(f"Error sending flapping summary on shutdown: {e}")
+
+    def _schedule_flap_flush(self) -> None:
+        deadline = self.flap_detector.next_deadline()
+        if deadline is None:
+            return
+        if self._flap_task is not None and not self._flap_task.done():
+            # Only a task that is sleeping toward a later deadline is replaced,
+            # e.g. when an eviction needs its summary sent right away.
+            if self._flap_sleep_until is None or deadline >= self._flap_sleep_until:
+                return
+            self._flap_task.cancel()
+        self._flap_task = asyncio.create_task(self._flush_flapping())
+
+    async def _flush_flapping(self) -> None:
+        """Send one summary embed per flapping alert as damping windows close"""
+        while (deadline := self.flap_detector.next_deadline()) is not None:
+            now = self.clock()
+            if deadline > now:
+                self._flap_sleep_until = deadline
+                await asyncio.sleep(deadline - now)
+                self._flap_sleep_until = None
+                now = self.clock()
+
+            released = self.flap_detector.due(now)
+            embeds = [
+                self.format_flapping_embed(alert, transitions)
+                for alert, transitions in released
+            ]
+            if embeds:
                 try:
-                    response = await client.post(self.webhook_url, json=payload, timeout=10)
-                    response.raise_for_status()
-                    logger.info(f"Successfully sent {len(batch)} embed(s) to Discord")
-                except httpx.HTTPStatusError as e:
-                    error_detail = ""
-                    try:
-                        error_detail = e.response.json()
-                    except Exception:
-                        error_detail = e.response.text
-                    
-                    logger.error(
-                        f"Discord webhook failed with status {e.response.status_code}: {error_detail}"
+                    await self._send_embeds(embeds)
+                except asyncio.CancelledError:
+                    self.flap_detector.requeue(released)
+                    raise
+                except Exception as e:
+                    logger.error(f"Error sending flapping summary: {e}")
+
+    async def _send_embeds(
+        self,
+        embeds: List[Dict[str, Any]],
+        keys: Optional[List[str]] = None,
+    ) -> None:
+        """Post embeds in batches, running independent batches concurrently.
+
+        `keys` identifies the alert instance behind each embed. A batch that
+        shares a key with an earlier batch waits for it to finish, so a firing
+        embed always lands before its resolve. If that earlier batch failed,
+        the embeds for the shared alerts are skipped rather than sent out of
+        order. Every other batch is still attempted; failures are collected
+        and raised together as a DeliveryError.
+        """
+        if keys is None:
+            keys = [f"#{i}" for i in range(len(embeds))]
+        size = self.batch_size
+        batches = [
+            (embeds[i:i+size], keys[i:i+size])
+            for i in range(0, len(embeds), size)
+        ]
+        failed_keys: set = set()
+
+        async with httpx.AsyncClient(transport=self.transport) as client:
+            tasks: List[asyncio.Task] = []
+            last_batch_for_key: Dict[str, asyncio.Task] = {}
+
+            for batch, batch_keys in batches:
+                predecessors = {
+                    last_batch_for_key[key]
+                    for key in batch_keys
+                    if key in last_batch_for_key
+                }
+                task = asyncio.create_task(
+                    self._send_batch(client, batch, batch_keys, predecessors, failed_keys)
+                )
+                tasks.append(task)
+                for key in batch_keys:
+                    last_batch_for_key[key] = task
+
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        errors: List[str] = []
+        failed = 0
+        delivered = 0
+        for (batch, _), result in zip(batches, results):
+            if isinstance(result, BaseException):
+                failed += 1
+                errors.append(str(result))
+            else:
+                delivered += len(batch) - result
+                if result:
+                    errors.append(
+                        f"Skipped {result} embed(s) because an earlier batch for the same alert failed"
                     )
-                    raise Exception(
-                        f"Discord API error ({e.response.status_code}): {error_detail}"
-                    ) from e
-                except httpx.TimeoutException as e:
-                    logger.error(f"Discord webhook timeout after 10s")
-                    raise Exception("Discord webhook request timed out") from e
-                except httpx.RequestError as e:
-                    logger.error(f"Discord webhook request failed: {e}")
-                    raise Exception(f"Failed to reach Discord webhook: {e}") from e
-
-notifier = DiscordNotifier(settings.discord_webhook_url)
+
+        if errors:
+            raise DeliveryError(
+                f"{failed} of {len(batches)} Discord batch(es) failed, "
+                f"{delivered} of {len(embeds)} embed(s) delivered: " + "; ".join(errors),
+                delivered=delivered,
+                errors=errors,
+            )
+
+    async def _send_batch(
+        self,
+        client: httpx.AsyncClient,
+        batch: List[Dict[str, Any]],
+        batch_keys: List[str],
+        predecessors: set,
+        failed_keys: set,
+    ) -> int:
+        """Send one batch and return how many of its embeds were skipped"""
+        if predecessors:
+            await asyncio.wait(predecessors)
+
+        sendable = [
+            (embed, key)
+            for embed, key in zip(batch, batch_keys)
+            if key not in failed_keys
+        ]
+        skipped = len(batch) - len(sendable)
+        if not sendable:
+            raise Exception(
+                f"Skipped {skipped} embed(s) because an earlier batch for the same alert failed"
+            )
+
+        try:
+            await self._post_batch(client, [embed for embed, _ in sendable])
+        except Exception:
+            failed_keys.update(key for _, key in sendable)
+            raise
+        return skipped
+
+    async def _post_batch(
+        self,
+        client: httpx.AsyncClient,
+        batch: List[Dict[str, Any]],
+    ) -> None:
+        async with self._in_flight:
+            await self.rate_limiter.acquire()
+
+            payload = {
+                'embeds': batch,
+                'username': 'HomeLab Monitor'
+            }
+
+            try:
+                response = await client.post(self.webhook_url, json=payload, timeout=10)
+                response.raise_for_status()
+                logger.info(f"Successfully sent {len(batch)} embed(s) to Discord")
+            except httpx.HTTPStatusError as e:
+                error_detail = ""
+                try:
+                    error_detail = e.response.json()
+                except Exception:
+                    error_detail = e.response.text
+
+                logger.error(
+                    f"Discord webhook failed with status {e.response.status_code}: {error_detail}"
+                )
+                raise Exception(
+                    f"Discord API error ({e.response.status_code}): {error_detail}"
+                ) from e
+            except httpx.TimeoutException as e:
+                logger.error(f"Discord webhook timeout after 10s")
+                raise Exception("Discord webhook request timed out") from e
+            except httpx.RequestError as e:
+                logger.error(f"Discord webhook request failed: {e}")
+                raise Exception(f"Failed to reach Discord webhook: {e}") from e
+
+notifier = DiscordNotifier(
+    settings.discord_webhook_url,
+    flap_threshold=settings.flap_threshold,
+    flap_window_seconds=settings.flap_window_seconds,
+    flap_max_tracked=settings.flap_max_tracked,
+    max_in_flight=settings.max_in_flight,
+    rate_limit_requests=settings.rate_limit_requests,
+    rate_limit_window_seconds=settings.rate_limit_window_seconds,
+)
@@ -0,0 +1,291 @@
+"""Offline simulator for the Discord delivery pipeline.
+
+Runs the real DiscordNotifier (flap detection, batching, rate limiter) on an
+event loop with a virtual clock, against a simulated Discord webhook. Hours
+of synthetic traffic complete in seconds of wall time, so rate limits and
+batch policies can be tuned before deploying.
+"""
+import asyncio
+import json
+import logging
+import random
+import selectors
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from pydantic import BaseModel
+
+from .models import UnifiedAlert
+from .notifier import DiscordNotifier
+
+logger = logging.getLogger(__name__)
+
+SIMULATED_WEBHOOK_URL = "https://discord.com/api/webhooks/simulation/simulation"
+
+# An arrival is one incoming webhook call: when it arrives and the alerts it carries.
+Arrival = Tuple[float, List[UnifiedAlert]]
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Selector that jumps the virtual clock instead of blocking"""
+
+    def __init__(self, loop: 'VirtualTimeEventLoop') -> None:
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout: Optional[float] = None) -> List[Tuple[selectors.SelectorKey, int]]:
+        if timeout is None:
+            raise RuntimeError("Simulation stalled: nothing scheduled and nothing ready to run")
+        if timeout > 0:
+            self._loop.advance(timeout)
+        return super().select(0)
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """Event loop whose time only moves forward when every task is waiting.
+
+    `asyncio.sleep` and other timers complete instantly in wall time while
+    `time()` reports the simulated clock.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._virtual_time = start
+        super().__init__(_VirtualSelector(self))
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def advance(self, seconds: float) -> None:
+        self._virtual_time += seconds
+
+
+class SimulatedDiscord:
+    """Webhook endpoint that enforces a sliding-window rate limit like Discord"""
+
+    def __init__(
+        self,
+        clock: 'VirtualTimeEventLoop',
+        max_requests: int = 30,
+        window_seconds: int = 60,
+        latency_seconds: float = 0.2,
+    ) -> None:
+        self.clock = clock
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.latency_seconds = latency_seconds
+        self.accepted: deque = deque()
+        self.delivered: List[Tuple[float, Dict[str, Any]]] = []
+        self.requests = 0
+        self.rate_limited = 0
+        self.peak_window_requests = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency_seconds / 2)
+        now = self.clock.time()
+        self.requests += 1
+
+        while self.accepted and self.accepted[0] <= now - self.window_seconds:
+            self.accepted.popleft()
+
+        if len(self.accepted) >= self.max_requests:
+            self.rate_limited += 1
+            retry_after = self.accepted[0] + self.window_seconds - now
+            await asyncio.sleep(self.latency_seconds / 2)
+            return httpx.Response(
+                429,
+                json={"message": "You are being rate limited.", "retry_after": retry_after},
+            )
+
+        self.accepted.append(now)
+        self.peak_window_requests = max(self.peak_window_requests, len(self.accepted))
+        for embed in json.loads(request.content)["embeds"]:
+            self.delivered.append((now, embed))
+        await asyncio.sleep(self.latency_seconds / 2)
+        return httpx.Response(204)
+
+
+class SimulationReport(BaseModel):
+    duration_seconds: float
+    alerts: int
+    delivered: int
+    flapping_summaries: int
+    held: int
+    undelivered: int
+    requests: int
+    rate_limited: int
+    failed_deliveries: int
+    latency_p50: Optional[float] = None
+    latency_p90: Optional[float] = None
+    latency_p99: Optional[float] = None
+    latency_max: Optional[float] = None
+    budget_usage: float
+    peak_budget_usage: float
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def poisson_trace(
+    rate_per_second: float,
+    duration_seconds: float,
+    distinct_alerts: int = 50,
+    flip_probability: float = 0.0,
+    seed: int = 0,
+) -> List[Arrival]:
+    """Single-alert arrivals with exponentially distributed gaps.
+
+    Each arrival picks one of `distinct_alerts` titles and flips that alert's
+    status from its previous value with `flip_probability`.
+    """
+    rng = random.Random(seed)
+    statuses: Dict[str, str] = {}
+    trace: List[Arrival] = []
+    at = rng.expovariate(rate_per_second)
+    while at < duration_seconds:
+        title = f"Alert {rng.randrange(distinct_alerts)}"
+        status = statuses.get(title, "firing")
+        if title in statuses and rng.random() < flip_probability:
+            status = "resolved" if status == "firing" else "firing"
+        statuses[title] = status
+        trace.append((at, [UnifiedAlert(title=title, summary=f"{title} is {status}", status=status)]))
+        at += rng.expovariate(rate_per_second)
+    return trace
+
+
+def burst_trace(at: float, count: int, prefix: str = "Storm") -> List[Arrival]:
+    """One grouped payload carrying `count` distinct firing alerts"""
+    alerts = [
+        UnifiedAlert(title=f"{prefix} {i}", summary=f"{prefix} {i} is firing")
+        for i in range(count)
+    ]
+    return [(at, alerts)]
+
+
+class _TracingNotifier(DiscordNotifier):
+    """DiscordNotifier that tags each embed with the arrival it came from"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.sequence: Dict[int, int] = {}
+
+    def format_embed(self, alert: UnifiedAlert) -> Dict[str, Any]:
+        embed = super().format_embed(alert)
+        seq = self.sequence.get(id(alert))
+        if seq is not None:
+            embed['footer'] = {'text': f"sim#{seq}"}
+        return embed
+
+    def format_flapping_embed(self, alert: UnifiedAlert, transitions: int) -> Dict[str, Any]:
+        embed = super().format_flapping_embed(alert, transitions)
+        embed.pop('footer', None)
+        return embed
+
+
+async def _run(notifier: DiscordNotifier, trace: List[Arrival]) -> int:
+    loop = asyncio.get_running_loop()
+    tasks: List[asyncio.Task] = []
+    failures = 0
+
+    for at, alerts in sorted(trace, key=lambda arrival: arrival[0]):
+        delay = at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(notifier.send_notifications(alerts)))
+
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, BaseException):
+            failures += 1
+            logger.debug(f"Simulated delivery failed: {result}")
+
+    await notifier.drain()
+
+    return failures
+
+
+def simulate(
+    trace: List[Arrival],
+    *,
+    discord_max_requests: int = 30,
+    discord_window_seconds: int = 60,
+    latency_seconds: float = 0.2,
+    **notifier_options: Any,
+) -> SimulationReport:
+    """Replay `trace` through a DiscordNotifier on virtual time and report on delivery.
+
+    `notifier_options` are passed to DiscordNotifier (rate_limit_requests,
+    max_in_flight, batch_size, flap_threshold, ...) so policies can be compared.
+    """
+    loop = VirtualTimeEventLoop()
+    try:
+        discord = SimulatedDiscord(
+            loop,
+            max_requests=discord_max_requests,
+            window_seconds=discord_window_seconds,
+            latency_seconds=latency_seconds,
+        )
+        notifier = _TracingNotifier(
+            SIMULATED_WEBHOOK_URL,
+            clock=loop.time,
+            transport=httpx.MockTransport(discord.handle),
+            **notifier_options,
+        )
+
+        # Every alert of every arrival gets its own copy and sequence number,
+        # which travels in the embed footer so deliveries match their arrival.
+        arrived_at: List[float] = []
+        tagged: List[Arrival] = []
+        for at, alerts in trace:
+            copies = [alert.model_copy() for alert in alerts]
+            for alert in copies:
+                notifier.sequence[id(alert)] = len(arrived_at)
+                arrived_at.append(at)
+            tagged.append((at, copies))
+
+        failures = loop.run_until_complete(_run(notifier, tagged))
+        duration = loop.time()
+    finally:
+        loop.close()
+
+    latencies: List[float] = []
+    summaries = 0
+    for delivered_at, embed in discord.delivered:
+        footer = embed.get('footer', {}).get('text', '')
+        if footer.startswith("sim#"):
+            latencies.append(delivered_at - arrived_at[int(footer[4:])])
+        else:
+            summaries += 1
+    latencies.sort()
+
+    alert_count = sum(len(alerts) for _, alerts in trace)
+    held = notifier.flap_detector.held_count
+    windows = max(1.0, duration / discord_window_seconds)
+    return SimulationReport(
+        duration_seconds=duration,
+        alerts=alert_count,
+        delivered=len(latencies),
+        flapping_summaries=summaries,
+        held=held,
+        undelivered=alert_count - held - len(latencies),
+        requests=discord.requests,
+        rate_limited=discord.rate_limited,
+        failed_deliveries=failures,
+        latency_p50=_percentile(latencies, 0.5),
+        latency_p90=_percentile(latencies, 0.9),
+        latency_p99=_percentile(latencies, 0.99),
+        latency_max=latencies[-1] if latencies else None,
+        budget_usage=(discord.requests - discord.rate_limited) / (discord_max_requests * windows),
+        peak_budget_usage=discord.peak_window_requests / discord_max_requests,
+    )
+
+
+if __name__ == "__main__":
+    storm = (
+        poisson_trace(rate_per_second=0.2, duration_seconds=6 * 3600, distinct_alerts=5, flip_probability=0.3)
+        + burst_trace(at=3600, count=500)
+    )
+    print(simulate(storm).model_dump_json(indent=2))
@@ -0,0 +1,100 @@
+from lab_alert_middleware.adapters import compile_adapter
+from lab_alert_middleware.models import AdapterSpec, FieldSpec
+
+
+GRAFANA_SPEC = AdapterSpec.model_validate({
+    "alerts": "alerts",
+    "title": ["labels.alertname", "$.title"],
+    "summary": ["annotations.summary", "$.message"],
+    "description": "annotations.description",
+    "severity": ["labels.severity", "$.commonLabels.severity"],
+    "status": ["status", "$.status"],
+    "timestamp": "startsAt",
+    "fingerprint": "fingerprint",
+})
+
+UPTIME_KUMA_SPEC = AdapterSpec.model_validate({
+    "title": "monitor.name",
+    "summary": ["heartbeat.msg", "msg"],
+    "status": {"paths": ["heartbeat.status"], "map": {"0": "firing", "1": "resolved"}},
+    "severity": {"default": "critical"},
+    "timestamp": "heartbeat.time",
+})
+
+
+def test_field_spec_shorthand():
+    assert FieldSpec.model_validate("a.b").paths == ["a.b"]
+    assert FieldSpec.model_validate(["a", "b"]).paths == ["a", "b"]
+
+def test_grafana_adapter_maps_each_alert():
+    adapt = compile_adapter(GRAFANA_SPEC)
+    payload = {
+        "status": "firing",
+        "title": "[FIRING:2] Grafana",
+        "commonLabels": {"severity": "Warning"},
+        "alerts": [
+            {
+                "status": "firing",
+                "labels": {"alertname": "HighCPU"},
+                "annotations": {"summary": "CPU at 95%", "description": "lab-pc-1"},
+                "startsAt": "2026-03-18T00:00:00Z",
+                "fingerprint": "a1b2c3",
+            },
+            {
+                "status": "resolved",
+                "labels": {"alertname": "DiskFull", "severity": "critical"},
+            },
+        ],
+    }
+
+    alerts = adapt(payload)
+
+    assert [a.title for a in alerts] == ["HighCPU", "DiskFull"]
+    assert alerts[0].summary == "CPU at 95%"
+    assert alerts[0].description == "lab-pc-1"
+    assert alerts[0].severity == "warning"
+    assert alerts[0].timestamp == "2026-03-18T00:00:00Z"
+    assert alerts[0].fingerprint == "a1b2c3"
+    assert alerts[1].fingerprint is None
+    assert alerts[1].status == "resolved"
+    assert alerts[1].severity == "critical"
+    assert alerts[1].summary == "DiskFull is resolved"
+
+def test_uptime_kuma_adapter_maps_status_values():
+    adapt = compile_adapter(UPTIME_KUMA_SPEC)
+
+    down = adapt({"monitor": {"name": "NAS"}, "heartbeat": {"status": 0, "msg": "timeout"}})
+    up = adapt({"monitor": {"name": "NAS"}, "heartbeat": {"status": 1, "msg": "OK"}})
+
+    assert down[0].status == "firing"
+    assert down[0].severity == "critical"
+    assert down[0].summary == "timeout"
+    assert up[0].status == "resolved"
+
+def test_adapter_defaults_for_missing_fields():
+    adapt = compile_adapter(AdapterSpec.model_validate({"title": "name"}))
+
+    alerts = adapt({"unrelated": True})
+
+    assert len(alerts) == 1
+    assert alerts[0].title == "Alert"
+    assert alerts[0].severity == "info"
+    assert alerts[0].status == "firing"
+    assert alerts[0].summary == "Alert is firing"
+
+def test_adapter_list_indices_and_non_string_values():
+    adapt = compile_adapter(AdapterSpec.model_validate({
+        "title": "checks.0.name",
+        "summary": "checks.0.value",
+    }))
+
+    alerts = adapt({"checks": [{"name": "Latency", "value": 250}]})
+
+    assert alerts[0].title == "Latency"
+    assert alerts[0].summary == "250"
+
+def test_adapter_alerts_path_not_a_list():
+    adapt = compile_adapter(AdapterSpec.model_validate({"alerts": "alerts", "title": "name"}))
+
+    assert adapt({"alerts": None}) == []
+    assert [a.title for a in adapt({"alerts": {"name": "Single"}})] == ["Single"]
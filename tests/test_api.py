@@ -1,6 +1,8 @@
 from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
+from lab_alert_middleware.adapters import compile_adapter
 from lab_alert_middleware.main import app
+from lab_alert_middleware.models import AdapterSpec
 
 client = TestClient(app)
 
@@ -131,7 +133,85 @@ def test_alertmanager_webhook_fallback_summary(mock_client_class):
     assert response.json() == {"status": "ok"}
 
 
+@patch("lab_alert_middleware.notifier.httpx.AsyncClient")
+def test_alertmanager_grouped_alerts_not_flapping(mock_client_class):
+    mock_response = AsyncMock()
+    mock_response.status_code = 200
+    mock_response.raise_for_status = lambda: None
+
+    mock_client = AsyncMock()
+    mock_client.post = AsyncMock(return_value=mock_response)
+    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+    mock_client.__aexit__ = AsyncMock(return_value=None)
+    mock_client_class.return_value = mock_client
+
+    payload = {
+        "status": "firing",
+        "commonLabels": {"alertname": "GroupedHostDown"},
+        "alerts": [
+            {
+                "status": "firing" if i % 2 == 0 else "resolved",
+                "labels": {"instance": f"host{i}"},
+            }
+            for i in range(6)
+        ],
+    }
+
+    for _ in range(2):
+        response = client.post("/alertmanager", json=payload)
+        assert response.status_code == 200
+
+    sent = sum(len(call.kwargs["json"]["embeds"]) for call in mock_client.post.call_args_list)
+    assert sent == 12
+
+
 def test_alertmanager_webhook_empty_alerts():
     response = client.post("/alertmanager", json={"status": "firing", "alerts": []})
     assert response.status_code == 422
     assert response.json()["detail"] == "No alerts provided in payload"
+
+
+@patch.dict(
+    "lab_alert_middleware.main.ingest_adapters",
+    {"kuma": compile_adapter(AdapterSpec.model_validate({
+        "title": "monitor.name",
+        "summary": "heartbeat.msg",
+        "status": {"paths": ["heartbeat.status"], "map": {"0": "firing", "1": "resolved"}},
+    }))},
+)
+@patch("lab_alert_middleware.notifier.httpx.AsyncClient")
+def test_adapter_webhook_payload(mock_client_class):
+    mock_response = AsyncMock()
+    mock_response.status_code = 200
+    mock_response.raise_for_status = lambda: None
+
+    mock_client = AsyncMock()
+    mock_client.post = AsyncMock(return_value=mock_response)
+    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+    mock_client.__aexit__ = AsyncMock(return_value=None)
+    mock_client_class.return_value = mock_client
+
+    payload = {"monitor": {"name": "NAS"}, "heartbeat": {"status": 0, "msg": "Connection refused"}}
+
+    response = client.post("/adapters/kuma", json=payload)
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    embed = mock_client.post.call_args.kwargs["json"]["embeds"][0]
+    assert embed["title"] == "ℹ️ INFO: NAS"
+    assert embed["description"] == "Connection refused"
+
+
+def test_adapter_webhook_unknown_adapter():
+    response = client.post("/adapters/missing", json={"title": "x"})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Unknown adapter 'missing'"
+
+
+@patch.dict(
+    "lab_alert_middleware.main.ingest_adapters",
+    {"grafana": compile_adapter(AdapterSpec.model_validate({"alerts": "alerts"}))},
+)
+def test_adapter_webhook_empty_alerts():
+    response = client.post("/adapters/grafana", json={"alerts": []})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "No alerts provided in payload"
@@ -37,9 +37,30 @@ def test_missing_webhook_url():
             os.environ["DISCORD_WEBHOOK_URL"] = old_value
 
 
+def test_invalid_max_in_flight():
+    with pytest.raises(ValidationError) as exc_info:
+        Settings(discord_webhook_url="https://discord.com/api/webhooks/123/abc", max_in_flight=0)
+
+    assert "max_in_flight must be at least 1" in str(exc_info.value)
+
+
 def test_default_values():
     # Test default values for optional settings
     settings = Settings(discord_webhook_url="https://discord.com/api/webhooks/123/abc")
     assert settings.host == "0.0.0.0"
     assert settings.port == 5001
     assert settings.app_name == "lab-alert-middleware"
+    assert settings.flap_threshold == 4
+    assert settings.flap_window_seconds == 300
+    assert settings.flap_max_tracked == 1000
+    assert settings.max_in_flight == 4
+    assert settings.rate_limit_requests == 30
+    assert settings.rate_limit_window_seconds == 60
+    assert settings.adapters == {}
+
+
+def test_adapters_from_json_env(monkeypatch):
+    monkeypatch.setenv("ADAPTERS", '{"kuma": {"title": "monitor.name", "severity": {"default": "critical"}}}')
+    settings = Settings(discord_webhook_url="https://discord.com/api/webhooks/123/abc")
+    assert settings.adapters["kuma"].title.paths == ["monitor.name"]
+    assert settings.adapters["kuma"].severity.default == "critical"
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import AsyncMock, patch
-from lab_alert_middleware.notifier import DiscordNotifier, RateLimiter
+from lab_alert_middleware.notifier import DeliveryError, DiscordNotifier, FlapDetector, RateLimiter
 from lab_alert_middleware.models import UnifiedAlert
 import httpx
 import asyncio
@@ -232,3 +232,437 @@ async def test_notifier_uses_rate_limiter():
     assert notifier.rate_limiter is not None
     assert notifier.rate_limiter.max_requests == 30
     assert notifier.rate_limiter.window_seconds == 60
+
+
+def test_flap_detector_passes_stable_alerts():
+    detector = FlapDetector(threshold=3, window_seconds=60)
+
+    assert detector.observe([UnifiedAlert(title="Disk", summary="Disk full")], now=0) == [True]
+    assert detector.observe([UnifiedAlert(title="Disk", summary="Disk full")], now=10) == [True]
+    assert detector.observe([UnifiedAlert(title="Disk", summary="Disk full", status="resolved")], now=20) == [True]
+    assert detector.next_deadline() is None
+
+def test_flap_detector_holds_flapping_alert():
+    detector = FlapDetector(threshold=3, window_seconds=60)
+    statuses = ["firing", "resolved", "firing", "resolved", "firing", "resolved"]
+
+    sent = [
+        detector.observe([UnifiedAlert(title="Temp", summary="Temp", status=status)], now=i)[0]
+        for i, status in enumerate(statuses)
+    ]
+
+    assert sent == [True, True, True, False, False, False]
+    assert detector.next_deadline() == 63
+    assert detector.due(now=62) == []
+
+    released = detector.due(now=63)
+    assert len(released) == 1
+    alert, transitions = released[0]
+    assert alert.status == "resolved"
+    assert transitions == 5
+    assert detector.next_deadline() is None
+
+def test_flap_detector_grouped_payload_with_shared_title():
+    detector = FlapDetector(threshold=3, window_seconds=60)
+    alerts = [
+        UnifiedAlert(
+            title="HostDown",
+            summary=f"host{i} is down",
+            status="firing" if i % 2 == 0 else "resolved",
+            fingerprint=f"host{i}",
+        )
+        for i in range(6)
+    ]
+
+    assert detector.observe(alerts, now=0) == [True] * 6
+    assert detector.observe(alerts, now=1) == [True] * 6
+    assert detector.next_deadline() is None
+
+def test_flap_detector_counts_one_transition_per_call():
+    detector = FlapDetector(threshold=2, window_seconds=60)
+    flips = [
+        UnifiedAlert(title="Temp", summary="Temp", status=status)
+        for status in ["firing", "resolved", "firing", "resolved", "firing"]
+    ]
+
+    assert detector.observe(flips, now=0) == [True] * 5
+    assert detector.observe(flips, now=1) == [True] * 5
+    assert not detector.states[next(iter(detector.states))].transitions
+
+def test_flap_detector_summary_changes_with_status():
+    detector = FlapDetector(threshold=2, window_seconds=60)
+    statuses = ["firing", "resolved", "firing"]
+
+    sent = [
+        detector.observe([UnifiedAlert(title="CPU", summary=f"CPU is {status}", status=status)], now=i)[0]
+        for i, status in enumerate(statuses)
+    ]
+
+    assert sent == [True, True, False]
+
+def test_flap_detector_uses_fingerprint():
+    detector = FlapDetector(threshold=2, window_seconds=60)
+    statuses = ["firing", "resolved", "firing"]
+
+    sent = [
+        detector.observe([UnifiedAlert(
+            title="HostDown",
+            summary=f"Host is {status}",
+            status=status,
+            fingerprint="host1",
+        )], now=i)[0]
+        for i, status in enumerate(statuses)
+    ]
+
+    assert sent == [True, True, False]
+
+def test_flap_detector_slow_transitions_not_flapping():
+    detector = FlapDetector(threshold=3, window_seconds=60)
+    statuses = ["firing", "resolved", "firing", "resolved"]
+
+    for i, status in enumerate(statuses):
+        assert detector.observe([UnifiedAlert(title="Temp", summary="Temp", status=status)], now=i * 100) == [True]
+
+def test_flap_detector_state_is_bounded():
+    detector = FlapDetector(threshold=2, window_seconds=60, max_tracked=2)
+
+    for i in range(5):
+        detector.observe([UnifiedAlert(title=f"Alert {i}", summary="Test")], now=i)
+
+    assert list(detector.states) == ["Alert 3", "Alert 4"]
+
+def test_flap_detector_disabled():
+    detector = FlapDetector(threshold=0)
+    alerts = [
+        UnifiedAlert(title="Temp", summary="Temp", status=status)
+        for status in ["firing", "resolved"] * 5
+    ]
+
+    assert detector.observe(alerts, now=0) == [True] * 10
+    assert not detector.states
+
+def test_format_flapping_embed():
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/test")
+    alert = UnifiedAlert(title="Temp", summary="Temp high", status="firing", severity="warning")
+
+    formatted = notifier.format_flapping_embed(alert, 7)
+
+    assert formatted["title"] == "🔁 FLAPPING (7 transitions): Temp"
+    assert formatted["color"] == 0x9B59B6
+    assert any(field["name"] == "Last Status" and field["value"] == "firing" for field in formatted["fields"])
+
+@pytest.mark.asyncio
+async def test_send_notifications_summarizes_flapping_alert():
+    notifier = DiscordNotifier(
+        webhook_url="https://discord.com/api/webhooks/123/test",
+        flap_threshold=2,
+        flap_window_seconds=1,
+    )
+
+    mock_response = AsyncMock()
+    mock_response.status_code = 200
+    mock_response.raise_for_status = lambda: None
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(return_value=mock_response)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        for status in ["firing", "resolved", "firing", "resolved", "firing"]:
+            await notifier.send_notifications([UnifiedAlert(title="Temp", summary="Temp", status=status)])
+
+        assert mock_client.post.call_count == 2
+        assert notifier.flap_detector.held_count == 3
+
+        await notifier.drain()
+
+        assert mock_client.post.call_count == 3
+        summary = mock_client.post.call_args.kwargs["json"]["embeds"][0]
+        assert summary["title"] == "🔁 FLAPPING (4 transitions): Temp"
+
+@pytest.mark.asyncio
+async def test_send_embeds_concurrent_within_limit():
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/test", max_in_flight=3)
+    in_flight = 0
+    peak = 0
+
+    async def slow_post(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        mock_response = AsyncMock()
+        mock_response.raise_for_status = lambda: None
+        return mock_response
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(side_effect=slow_post)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        alerts = [UnifiedAlert(title=f"Alert {i}", summary="Test") for i in range(80)]
+        await notifier.send_notifications(alerts)
+
+        assert mock_client.post.call_count == 8
+        assert peak == 3
+
+@pytest.mark.asyncio
+async def test_send_embeds_preserves_per_alert_order():
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/test", max_in_flight=4)
+    sent_titles = []
+
+    async def post(*args, **kwargs):
+        embeds = kwargs["json"]["embeds"]
+        # The first batch is slowest; later batches would overtake it if not ordered.
+        await asyncio.sleep(0.05 if "Alert 0" in embeds[0]["title"] else 0)
+        sent_titles.extend(embed["title"] for embed in embeds)
+        mock_response = AsyncMock()
+        mock_response.raise_for_status = lambda: None
+        return mock_response
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(side_effect=post)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        alerts = [UnifiedAlert(title=f"Alert {i}", summary="Test") for i in range(20)]
+        alerts.append(UnifiedAlert(title="Alert 0", summary="Test", status="resolved"))
+        alerts += [UnifiedAlert(title=f"Other {i}", summary="Test") for i in range(10)]
+        await notifier.send_notifications(alerts)
+
+        assert sent_titles.index("ℹ️ INFO: Alert 0") < sent_titles.index("✅ RESOLVED: Alert 0")
+        # Independent batches are not held back by the slow one.
+        assert sent_titles.index("ℹ️ INFO: Other 9") < sent_titles.index("ℹ️ INFO: Alert 0")
+
+@pytest.mark.asyncio
+async def test_send_embeds_concurrent_with_shared_titles():
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/test", max_in_flight=3)
+    in_flight = 0
+    peak = 0
+
+    async def slow_post(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        mock_response = AsyncMock()
+        mock_response.raise_for_status = lambda: None
+        return mock_response
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(side_effect=slow_post)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        alerts = [
+            UnifiedAlert(title="HostDown", summary=f"host{i} is down", fingerprint=f"host{i}")
+            for i in range(80)
+        ]
+        await notifier.send_notifications(alerts)
+
+        assert mock_client.post.call_count == 8
+        assert peak == 3
+
+@pytest.mark.asyncio
+async def test_max_in_flight_is_shared_across_deliveries():
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/test", max_in_flight=1)
+    in_flight = 0
+    peak = 0
+
+    async def slow_post(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        mock_response = AsyncMock()
+        mock_response.raise_for_status = lambda: None
+        return mock_response
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(side_effect=slow_post)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        await asyncio.gather(*(
+            notifier.send_notifications([UnifiedAlert(title=f"Alert {i}", summary="Test")])
+            for i in range(10)
+        ))
+
+        assert mock_client.post.call_count == 10
+        assert peak == 1
+
+def test_notifier_rejects_invalid_max_in_flight():
+    with pytest.raises(ValueError):
+        DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/test", max_in_flight=0)
+
+@pytest.mark.asyncio
+async def test_send_embeds_skips_dependents_of_failed_batch():
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/test")
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = lambda: None
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(
+            side_effect=[httpx.TimeoutException("Timeout"), mock_response, mock_response]
+        )
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        alerts = [UnifiedAlert(title=f"Alert {i}", summary="Test") for i in range(10)]
+        alerts.append(UnifiedAlert(title="Alert 0", summary="Test", status="resolved"))
+        alerts += [UnifiedAlert(title=f"Other {i}", summary="Test") for i in range(10)]
+
+        with pytest.raises(DeliveryError) as exc_info:
+            await notifier.send_notifications(alerts)
+
+        sent_titles = [
+            embed["title"]
+            for call in mock_client.post.call_args_list[1:]
+            for embed in call.kwargs["json"]["embeds"]
+        ]
+        assert "✅ RESOLVED: Alert 0" not in sent_titles
+        assert len(sent_titles) == 10
+        assert exc_info.value.delivered == 10
+        assert "Skipped 1 embed(s)" in str(exc_info.value)
+
+@pytest.mark.asyncio
+async def test_send_embeds_reports_partial_failure():
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/test")
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = lambda: None
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(
+            side_effect=[mock_response, httpx.TimeoutException("Timeout"), mock_response]
+        )
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        alerts = [UnifiedAlert(title=f"Alert {i}", summary="Test") for i in range(25)]
+
+        with pytest.raises(DeliveryError) as exc_info:
+            await notifier.send_notifications(alerts)
+
+        assert mock_client.post.call_count == 3
+        assert exc_info.value.delivered == 15
+        assert len(exc_info.value.errors) == 1
+        assert "1 of 3 Discord batch(es) failed" in str(exc_info.value)
+        assert "timed out" in str(exc_info.value)
+
+@pytest.mark.asyncio
+async def test_aclose_sends_held_summaries():
+    notifier = DiscordNotifier(
+        webhook_url="https://discord.com/api/webhooks/123/test",
+        flap_threshold=2,
+        flap_window_seconds=300,
+    )
+
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = lambda: None
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(return_value=mock_response)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        for status in ["firing", "resolved", "firing"]:
+            await notifier.send_notifications([UnifiedAlert(title="Temp", summary="Temp", status=status)])
+        flush_task = notifier._flap_task
+
+        assert mock_client.post.call_count == 2
+
+        await notifier.aclose()
+
+        assert flush_task.cancelled()
+        assert mock_client.post.call_count == 3
+        summary = mock_client.post.call_args.kwargs["json"]["embeds"][0]
+        assert summary["title"] == "🔁 FLAPPING (2 transitions): Temp"
+        assert notifier.flap_detector.next_deadline() is None
+
+@pytest.mark.asyncio
+async def test_aclose_requeues_summaries_interrupted_mid_send():
+    notifier = DiscordNotifier(
+        webhook_url="https://discord.com/api/webhooks/123/test",
+        flap_threshold=2,
+        flap_window_seconds=300,
+    )
+    notifier.flap_detector.observe([UnifiedAlert(title="Temp", summary="Temp")], now=0)
+    notifier.flap_detector.requeue([(UnifiedAlert(title="Temp", summary="Temp"), 3)])
+    posted = asyncio.Event()
+    sent_titles = []
+
+    async def post(*args, **kwargs):
+        if not posted.is_set():
+            posted.set()
+            await asyncio.sleep(10)
+        sent_titles.extend(embed["title"] for embed in kwargs["json"]["embeds"])
+        mock_response = AsyncMock()
+        mock_response.raise_for_status = lambda: None
+        return mock_response
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(side_effect=post)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        notifier._schedule_flap_flush()
+        await posted.wait()
+        await notifier.aclose()
+
+        assert sent_titles == ["🔁 FLAPPING (3 transitions): Temp"]
+
+@pytest.mark.asyncio
+async def test_eviction_wakes_sleeping_flush_task():
+    notifier = DiscordNotifier(
+        webhook_url="https://discord.com/api/webhooks/123/test",
+        flap_threshold=2,
+        flap_window_seconds=300,
+        flap_max_tracked=1,
+    )
+
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = lambda: None
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(return_value=mock_response)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client_class.return_value = mock_client
+
+        for status in ["firing", "resolved", "firing"]:
+            await notifier.send_notifications([UnifiedAlert(title="Temp", summary="Temp", status=status)])
+        assert mock_client.post.call_count == 2
+
+        # Tracking a second alert evicts the held one; its summary goes out
+        # without waiting for the 300s window.
+        await notifier.send_notifications([UnifiedAlert(title="Other", summary="Other")])
+        await asyncio.wait_for(notifier.drain(), timeout=1)
+
+        titles = [
+            embed["title"]
+            for call in mock_client.post.call_args_list
+            for embed in call.kwargs["json"]["embeds"]
+        ]
+        assert "🔁 FLAPPING (2 transitions): Temp" in titles
@@ -0,0 +1,124 @@
+from lab_alert_middleware.models import UnifiedAlert
+from lab_alert_middleware.notifier import RateLimiter
+from lab_alert_middleware.simulation import (
+    VirtualTimeEventLoop,
+    burst_trace,
+    poisson_trace,
+    simulate,
+)
+import asyncio
+
+
+def test_virtual_loop_advances_without_waiting():
+    loop = VirtualTimeEventLoop()
+    try:
+        loop.run_until_complete(asyncio.sleep(3600))
+        assert loop.time() == 3600
+    finally:
+        loop.close()
+
+def test_rate_limiter_on_virtual_clock():
+    loop = VirtualTimeEventLoop()
+    limiter = RateLimiter(max_requests=3, window_seconds=60, clock=loop.time)
+    acquired_at = []
+
+    async def acquire_many():
+        for _ in range(7):
+            await limiter.acquire()
+            acquired_at.append(loop.time())
+
+    try:
+        loop.run_until_complete(acquire_many())
+    finally:
+        loop.close()
+
+    assert acquired_at[:3] == [0, 0, 0]
+    assert all(abs(t - 60.1) < 1e-6 for t in acquired_at[3:6])
+    assert abs(acquired_at[6] - 120.2) < 1e-6
+
+def test_poisson_trace_is_deterministic():
+    first = poisson_trace(rate_per_second=0.1, duration_seconds=600, seed=7)
+    second = poisson_trace(rate_per_second=0.1, duration_seconds=600, seed=7)
+
+    assert [at for at, _ in first] == [at for at, _ in second]
+    assert all(at < 600 for at, _ in first)
+
+def test_simulate_burst_respects_budget():
+    report = simulate(burst_trace(at=10, count=100), latency_seconds=0.2)
+
+    assert report.alerts == 100
+    assert report.delivered == 100
+    assert report.requests == 10
+    assert report.rate_limited == 0
+    assert report.failed_deliveries == 0
+    assert report.latency_max < 1
+
+def test_simulate_storm_is_throttled_not_rejected():
+    report = simulate(burst_trace(at=0, count=500), max_in_flight=8)
+
+    assert report.delivered == 500
+    assert report.requests == 50
+    assert report.rate_limited == 0
+    assert report.peak_budget_usage == 1.0
+    # 50 batches at 30 per minute: the last ones wait for the next window.
+    assert report.latency_max > 60
+
+def test_simulate_shared_titles_stay_concurrent():
+    trace = [(0.0, [
+        UnifiedAlert(title="HostDown", summary=f"host{i} is down", fingerprint=f"host{i}")
+        for i in range(200)
+    ])]
+
+    report = simulate(trace, max_in_flight=8)
+
+    assert report.delivered == 200
+    assert report.latency_max < 1
+
+def test_simulate_damps_when_summary_changes_with_status():
+    trace = [
+        (i * 10.0, [UnifiedAlert(title="CPU", summary=f"CPU is {status}", status=status)])
+        for i, status in enumerate(["firing", "resolved"] * 5)
+    ]
+
+    report = simulate(trace, flap_threshold=3, flap_window_seconds=300)
+
+    assert report.held == 7
+    assert report.flapping_summaries == 1
+
+def test_simulate_latency_ignores_held_arrivals():
+    trace = [
+        (i * 10.0, [UnifiedAlert(title="Temp", summary="Temp", status=status)])
+        for i, status in enumerate(["firing", "resolved"] * 5)
+    ]
+    trace.append((7200.0, [UnifiedAlert(title="Temp", summary="Temp", status="resolved")]))
+    trace.append((7300.0, [UnifiedAlert(title="Temp", summary="Temp", status="firing")]))
+
+    report = simulate(trace, flap_threshold=3, flap_window_seconds=300)
+
+    assert report.held == 7
+    assert report.delivered == 5
+    assert report.latency_max < 1
+
+def test_simulate_reports_429s_when_limits_mismatch():
+    report = simulate(
+        burst_trace(at=0, count=200),
+        discord_max_requests=5,
+        rate_limit_requests=30,
+    )
+
+    assert report.rate_limited == 15
+    assert report.failed_deliveries == 1
+    assert report.delivered == 50
+
+def test_simulate_flapping_alerts_are_summarized():
+    trace = [
+        (i * 10.0, [UnifiedAlert(title="Temp", summary="Temp", status=status)])
+        for i, status in enumerate(["firing", "resolved"] * 5)
+    ]
+
+    report = simulate(trace, flap_threshold=3, flap_window_seconds=300)
+
+    assert report.delivered == 3
+    assert report.flapping_summaries == 1
+    assert report.held == 7
+    assert report.undelivered == 0